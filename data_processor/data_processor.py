@@ -1,9 +1,19 @@
 """
     Module providing methods on our specific dataframe
 """
-from tkinter import messagebox
 from pathlib import Path
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from pyarrow import parquet as pa_parquet
+
+# Number of bytes parsed at once, the CSV is aggregated block by block
+BLOCK_SIZE = 16 * 1024 * 1024
+# Processed data file, also reused as a cache while the CSV is unchanged
+PROCESSED_FILE_NAME = 'processed_data.parquet'
+# Text columns are kept as Arrow-backed strings rather than Python objects
+ARROW_STRING_MAPPING = {pa.string(): pd.StringDtype('pyarrow')}
 
 
 class DataFrameHolder:
@@ -22,9 +32,10 @@ class DataFrameHolder:
             file_name (str): The name of the CSV file to be opened.
         """
         self.current_dir = Path(__file__).resolve().parent
-        self._data_frame = self.load_csv_file(file_name)
         self._fuel_columns = ['Gazole_prix', 'SP98_prix', 'SP95_prix',
                               'E85_prix', 'E10_prix', 'GPLc_prix']
+        self._file_name = file_name
+        self._data_frame = None
 
     @property
     def price_columns(self):
@@ -54,120 +65,276 @@ class DataFrameHolder:
             file_name (str): The name of the CSV file to be loaded.
 
         Returns:
-            pd.DataFrame or None: If successful, returns a DataFrame with the
-            CSV data. If an error occurs, returns None and displays an error
-            message.
+            pyarrow.csv.CSVStreamingReader or None: If successful, returns an
+            iterator over record batches of the CSV data. If an error occurs,
+            returns None and displays an error message.
         """
         # Navigate to the parent directory and access the "web_scraper"
         # directory.
         csv_path = self.current_dir.parent / 'web_scraper' / file_name
 
+        # Only parse the columns kept by the data cleaning, with explicit
+        # types to skip the type inference
+        text_columns = ['Région', 'Département', 'Code postal', 'Ville',
+                        'geom']
+        columns_type = {**{col: pa.string() for col in text_columns},
+                        **{fuel: pa.float64() for fuel in self._fuel_columns}}
+
         # Errorshandling : we attempt to open the file, and if an error
         # occurs, display an error message through tkinter
         try:
-            return pd.read_csv(csv_path, dtype={'Code postal': 'str'},
-                               delimiter=';')
+            return pa_csv.open_csv(
+                csv_path,
+                read_options=pa_csv.ReadOptions(block_size=BLOCK_SIZE),
+                parse_options=pa_csv.ParseOptions(delimiter=';'),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=list(columns_type),
+                    column_types=columns_type,
+                    strings_can_be_null=True))
         except FileNotFoundError as exception:
-            messagebox.showerror("Error", f"The file '{csv_path}' was not "
-                                          f"found: {exception}")
+            self._show_error(f"The file '{csv_path}' was not found: "
+                             f"{exception}")
             return None
-        except pd.errors.EmptyDataError as exception:
-            messagebox.showerror("Error", f"The file '{csv_path}' is empty: "
-                                          f"{exception}")
+        except pa.ArrowInvalid as exception:
+            self._show_error(f"The file '{csv_path}' is empty or invalid: "
+                             f"{exception}")
             return None
         except Exception as exception:  # pylint: disable=broad-except
-            messagebox.showerror("Error", f"An error occurred: {exception}")
+            self._show_error(f"An error occurred: {exception}")
             return None
 
     def process_data(self):
         """
-        Processes the data by performing data cleaning and computing a new
-        DataFrame.
+        Processes the data by cleaning and partially aggregating each block of
+        the CSV, then computing a new DataFrame from the partial results. If
+        the processed data file was built from the current CSV, it is loaded
+        instead.
         """
         print('wait for the data processing...')
-        self._data_cleaning()
-        self._compute_new_dataframe()
+        csv_path = self.current_dir.parent / 'web_scraper' / self._file_name
+        cache_path = (self.current_dir.parent / 'data_visualizer'
+                      / PROCESSED_FILE_NAME)
+
+        if self._is_cache_valid(csv_path, cache_path):
+            self._data_frame = self._load_processed_file(cache_path)
+        else:
+            csv_reader = self.load_csv_file(self._file_name)
+            if csv_reader is None:
+                return
+
+            # Only the first block is parsed when the reader is opened, the
+            # next ones may still be invalid and are checked while iterating
+            try:
+                partials = pd.concat(
+                    self._aggregate_chunk(self._data_cleaning(
+                        batch.to_pandas(
+                            types_mapper=ARROW_STRING_MAPPING.get)))
+                    for batch in csv_reader)
+            except pa.ArrowInvalid as exception:
+                self._show_error(f"The file '{csv_path}' is invalid: "
+                                 f"{exception}")
+                return
 
-    def _data_cleaning(self):
+            # Only the small partials outlive the parsing, the reader and its
+            # last batch are released before combining
+            del csv_reader
+            self._compute_new_dataframe(partials)
+
+        self._fuel_columns = [col.split('_', maxsplit=1)[0] for col in
+                              self._fuel_columns]
+
+    def _is_cache_valid(self, csv_path, cache_path):
         """
-        Performs data cleaning operations on the DataFrame.
+        Checks that the processed data file was built from the current CSV:
+        it must be newer than the CSV and record the same file name and size.
+
+        Args:
+            csv_path (Path): The path of the CSV file.
+
+            cache_path (Path): The path of the processed data Parquet file.
+
+        Returns:
+            bool: True if the processed data file can be loaded instead of
+            the CSV.
         """
-        useful_columns = (['Région', 'Département', 'Code postal', 'Ville',
-                           'geom'] + self.price_columns)
+        if not (csv_path.is_file() and cache_path.is_file()):
+            return False
+        if cache_path.stat().st_mtime < csv_path.stat().st_mtime:
+            return False
 
-        self._data_frame = self._data_frame[useful_columns]
-        self._data_frame['cp_ville'] = (self._data_frame['Code postal'] + ' '
-                                        + self._data_frame['Ville'])
-        self._data_frame = (self._data_frame.drop(
-            columns=['Ville', 'Code postal']))
+        # A CSV restored with its original date would still look older than
+        # the cache, so its name and size are also compared
+        metadata = pa_parquet.read_schema(cache_path).metadata or {}
+        return all(metadata.get(key) == value for key, value in
+                   self._get_source_metadata(csv_path).items())
 
-        self._data_frame = self._data_frame.rename(
-            columns={fuel: fuel.split('_', maxsplit=1)[0] for fuel in
-                     self._fuel_columns})
+    @staticmethod
+    def _get_source_metadata(csv_path):
+        """
+        Get the description of the CSV file stored in the metadata of the
+        processed data Parquet file.
 
-        # Delete data without specify (Région, département, Ville)
-        self._data_frame = self._data_frame.dropna(subset=['Région'])
-        self._fuel_columns = [col.split('_', maxsplit=1)[0] for col in self._fuel_columns]
+        Args:
+            csv_path (Path): The path of the CSV file.
 
-        # Split geom and floating them to get latitude and longitude
-        self._data_frame['geom'] = (
-            self._data_frame['geom'].
-            apply(
-                lambda x: [float(coord) for coord in x.split(', ') if coord]))
+        Returns:
+            dict: The name and the size of the CSV file, as bytes.
+        """
+        return {b'source_file': csv_path.name.encode(),
+                b'source_size': str(csv_path.stat().st_size).encode()}
 
-    def _compute_new_dataframe(self):
+    @staticmethod
+    def _load_processed_file(file_path):
         """
-        Computes a new DataFrame by performing various operations.
+        Loads a processed data Parquet file with the same dtypes as a freshly
+        processed DataFrame.
+
+        Args:
+            file_path (Path): The path of the Parquet file.
+
+        Returns:
+            pd.DataFrame: The processed data.
         """
-        # Mapping region and department linked to each city
-        city_geo_mapping = (
-            self._data_frame.groupby('cp_ville')[['Région', 'Département']]
-            .first().reset_index())
+        # Text columns are read back as Arrow strings, and so are the
+        # categories of the regions and departments, which Parquet returns
+        # as Python strings
+        data_frame = pa_parquet.read_table(file_path).to_pandas(
+            types_mapper=ARROW_STRING_MAPPING.get)
+        for col in ['Région', 'Département']:
+            data_frame[col] = data_frame[col].cat.rename_categories(
+                data_frame[col].cat.categories.astype(
+                    pd.StringDtype('pyarrow')))
+        return data_frame
 
-        # Performing average prices per city
-        city_prices_means = (
-            self._data_frame.groupby('cp_ville')[self._fuel_columns].mean()
-            .reset_index())
+    def _data_cleaning(self, chunk):
+        """
+        Performs data cleaning operations on a chunk of the CSV.
 
-        # Performing the average coordinates per city
-        city_coords_means = (self._data_frame.groupby('cp_ville')['geom']
-                             .apply(self._mean_coords)
-                             .reset_index(level=1, drop=True)
-                             .reset_index())
+        Args:
+            chunk (pd.DataFrame): A chunk of the raw CSV data.
 
-        # Count occurrences per city
-        city_app_count = (self._data_frame.groupby('cp_ville').size()
-                          .reset_index(name='Nombre de stations'))
+        Returns:
+            pd.DataFrame: The cleaned chunk.
+        """
+        useful_columns = (['Région', 'Département', 'Code postal', 'Ville',
+                           'geom'] + self._fuel_columns)
+
+        chunk = chunk[useful_columns]
+
+        # Delete data without specify (Région, département, Ville)
+        chunk = chunk.dropna(subset=['Région', 'Code postal', 'Ville'])
+
+        # Split geom into two float columns to get latitude and longitude
+        coords = chunk['geom'].str.split(', ', n=1, expand=True)
+        chunk[['Latitude', 'Longitude']] = coords.astype('float64')
+        return chunk.drop(columns=['geom'])
+
+    def _aggregate_chunk(self, chunk):
+        """
+        Computes the partial aggregations of a cleaned chunk per city: first
+        region and department, sums and counts of the prices and coordinates,
+        and stations count.
+
+        Args:
+            chunk (pd.DataFrame): A cleaned chunk of the CSV data.
+
+        Returns:
+            pd.DataFrame: The partial aggregations indexed by city.
+        """
+        # Cities are factorized once on the (postal code, city) pair so the
+        # groupby hashes integer codes and no key string is built per row
+        codes, cities = pd.MultiIndex.from_frame(
+            chunk[['Code postal', 'Ville']]).factorize()
+        partial = chunk.groupby(codes, sort=False, observed=True).agg(
+            **{'Région': ('Région', 'first'),
+               'Département': ('Département', 'first'),
+               'Nombre de stations': ('Région', 'size')})
+
+        # Sums and counts of all the prices and coordinates are accumulated
+        # per city code at once, in a single pass over the codes
+        mean_columns = self._fuel_columns + ['Latitude', 'Longitude']
+        sums, counts = self._group_sums_counts(
+            codes, chunk[mean_columns].to_numpy('float64'), len(cities))
+        partial[[f'{col}_sum' for col in mean_columns]] = sums
+        partial[[f'{col}_count' for col in mean_columns]] = counts
 
-        # Merge all
-        self._data_frame = (city_geo_mapping
-                            .merge(city_prices_means, on='cp_ville')
-                            .merge(city_coords_means, on='cp_ville')
-                            .merge(city_app_count, on='cp_ville'))
+        partial.index = cities[partial.index]
+        return partial
 
     @staticmethod
-    def _mean_coords(coords_list):
+    def _group_sums_counts(codes, values, groups_count):
         """
-        Computes the mean of latitude and longitude from a list of coordinates.
+        Computes the sums and the counts of the non-missing values per group,
+        for all the columns of values at once.
 
         Args:
-            coords_list (list): List of coordinates.
+            codes (np.ndarray): The group code of each row.
+
+            values (np.ndarray): The float values to aggregate, one row per
+            code and one column per aggregated column.
+
+            groups_count (int): The number of groups.
 
         Returns:
-            tuple: Mean latitude and mean longitude.
+            tuple: The sums and the counts of the values, of shape
+            (groups_count, number of columns).
+        """
+        columns_count = values.shape[1]
+        # Each (group, column) pair gets its own bin so a single bincount
+        # covers every column
+        bins = (codes[:, np.newaxis] * columns_count
+                + np.arange(columns_count)).ravel()
+        missing = np.isnan(values).ravel()
+        sums = np.bincount(bins, weights=np.where(missing, 0, values.ravel()),
+                           minlength=groups_count * columns_count)
+        counts = np.bincount(bins[~missing],
+                             minlength=groups_count * columns_count)
+        return (sums.reshape(groups_count, columns_count),
+                counts.reshape(groups_count, columns_count))
+
+    def _compute_new_dataframe(self, partials):
+        """
+        Computes a new DataFrame by combining the partial aggregations of all
+        the chunks into the average prices and coordinates per city.
+
+        Args:
+            partials (pd.DataFrame): The concatenated partial aggregations.
         """
-        latitudes = [coord[0] for coord in coords_list if coord]
-        longitudes = [coord[1] for coord in coords_list if coord]
+        # Codes follow the sorted cities, so sorting the groups (cheap on
+        # integers) keeps the output ordered by postal code and city
+        codes, cities = partials.index.factorize(sort=True)
+        combined = partials.groupby(codes, sort=True, observed=True).agg(
+            {col: 'first' if col in ('Région', 'Département') else 'sum'
+             for col in partials.columns})
 
-        return pd.DataFrame({'Latitude': [sum(latitudes) / len(latitudes)],
-                             'Longitude': [sum(longitudes) / len(longitudes)]})
+        # The result is built column-wise from the combined partials, which
+        # all share the same city order. The cp_ville key is only built once
+        # per city. Regions and departments repeat over many cities, so they
+        # are stored as categoricals to group and compare integer codes.
+        # Coordinates and stations counts are downcast to 32 bits, prices
+        # keep float64 so that the averages and histogram bins stay exact.
+        self._data_frame = pd.DataFrame({
+            'cp_ville': pd.array(cities.get_level_values(0) + ' '
+                                 + cities.get_level_values(1),
+                                 dtype='string[pyarrow]'),
+            'Région': combined['Région'].astype('category').array,
+            'Département': combined['Département'].astype('category').array,
+            **{col.split('_', maxsplit=1)[0]: (
+                combined[f'{col}_sum'] / combined[f'{col}_count']).to_numpy()
+               for col in self._fuel_columns},
+            **{col: (combined[f'{col}_sum'] / combined[f'{col}_count'])
+               .to_numpy('float32') for col in ['Latitude', 'Longitude']},
+            'Nombre de stations':
+                combined['Nombre de stations'].to_numpy('int32'),
+        })
 
-    def save_dataframe(self, name='processed_data.csv'):
+    def save_dataframe(self, name=PROCESSED_FILE_NAME):
         """
-        Saves the DataFrame to a CSV file.
+        Saves the DataFrame to a Parquet, Feather or CSV file depending on the
+        extension of its name.
 
         Args:
-            name (str, optional): The name of the output CSV file.
+            name (str, optional): The name of the output file.
         """
         # Get visualizer directory to save data
         target_dir = self.current_dir.parent / 'data_visualizer'
@@ -179,6 +346,40 @@ class DataFrameHolder:
         # occurs, display an error message through tkinter
         try:
             file_path = target_dir / name
-            self._data_frame.to_csv(file_path, index=False)
+            # Binary columnar formats reload much faster than CSV and keep
+            # the exact float values
+            if file_path.suffix == '.parquet':
+                # The source CSV is recorded in the schema metadata, so that
+                # the file is only reused as a cache for that same CSV
+                table = pa.Table.from_pandas(self._data_frame,
+                                             preserve_index=False)
+                csv_path = (self.current_dir.parent / 'web_scraper'
+                            / self._file_name)
+                if csv_path.is_file():
+                    table = table.replace_schema_metadata({
+                        **table.schema.metadata,
+                        **self._get_source_metadata(csv_path)})
+                pa_parquet.write_table(table, file_path, compression='zstd')
+            elif file_path.suffix == '.feather':
+                self._data_frame.to_feather(file_path)
+            else:
+                # Arrow's CSV writer is vectorized in C++, unlike to_csv
+                pa_csv.write_csv(
+                    pa.Table.from_pandas(self._data_frame,
+                                         preserve_index=False),
+                    file_path)
         except Exception as exception:  # pylint: disable=broad-except
-            messagebox.showerror("Error", f"An error occurred: {exception}")
+            self._show_error(f"An error occurred: {exception}")
+
+    @staticmethod
+    def _show_error(message):
+        """
+        Displays an error message through tkinter. tkinter is only imported
+        when an error occurs, so the processing itself never loads it.
+
+        Args:
+            message (str): The error message to display.
+        """
+        # pylint: disable-next=import-outside-toplevel
+        from tkinter import messagebox
+        messagebox.showerror("Error", message)
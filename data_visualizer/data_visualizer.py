@@ -2,16 +2,42 @@
     Module that allows to display our information on the dashboard
 """
 
+from functools import lru_cache
+from pathlib import Path
 import dash
 import folium
-import pandas as pd
-import plotly.express as px
+import numpy as np
+import plotly.colors
 import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
-from dash import dcc, html, Input, Output
-from folium.plugins import MarkerCluster
-
-
+from dash import dcc, html, Input, Output, State
+from folium.plugins import FastMarkerCluster
+
+# Width in € of the bins of the price histograms
+HISTOGRAM_BIN_SIZE = 0.05
+
+# Rendered map, written in the assets folder and served as a static file
+MAP_FILE_NAME = 'stations_map.html'
+
+# Javascript function creating a city marker in the browser from a
+# [latitude, longitude, popup content] row
+CITY_MARKER_CALLBACK = """
+    function (row) {
+        var marker = L.marker(new L.LatLng(row[0], row[1]));
+        marker.bindPopup(row[2], {maxWidth: 300});
+        return marker;
+    }"""
+
+# Javascript function returning the stored histogram of the selected fuel
+HISTOGRAM_SWITCH_CALLBACK = """
+    function (fuel, histograms) {
+        return histograms[fuel];
+    }"""
+
+
+# The tables, options and layouts precomputed for the callbacks are kept as
+# attributes, so that every callback only reads them
+# pylint: disable-next=too-many-instance-attributes
 class DashboardHolder:
     """
     Initialize the DashboardHolder class.
@@ -38,6 +64,104 @@ class DashboardHolder:
         self.dep = dataframe['Département'].unique()
         self.reg = dataframe['Région'].unique()
         self.reg_color_mapping = self._generate_color_mapping(self.reg)
+        # Departments of each region and cities of each department, listed
+        # once so that the dropdowns do not scan the whole DataFrame
+        self.reg_departments = {
+            reg: deps.tolist() for reg, deps in
+            dataframe.groupby('Région', sort=False, observed=True)
+            ['Département'].unique().items()
+        }
+        self.dep_cities = {
+            dep: cities.tolist() for dep, cities in
+            dataframe.groupby('Département', sort=False, observed=True)
+            ['cp_ville'].unique().items()
+        }
+        # Percentage of cities where each fuel is available, for France and
+        # per region, department and city, computed once. The national one is
+        # sorted once, it gives the order of the availability bar charts.
+        fuel_presence = dataframe[self.fuel_columns].notna()
+        self.fuel_availability = {
+            'France': (fuel_presence.mean().mul(100).round().astype(int)
+                       .sort_values(ascending=False)),
+            **{area_column: (fuel_presence
+                             .groupby(dataframe[area_column], sort=False,
+                                      observed=True)
+                             .mean().mul(100).round().astype(int))
+               for area_column in ['Région', 'Département', 'cp_ville']}
+        }
+        # Average price of each fuel for France and per region, department
+        # and city, computed once
+        self.avg_prices = {
+            'France': dataframe[self.fuel_columns].mean(),
+            **{area_column: (dataframe
+                             .groupby(area_column, sort=False, observed=True)
+                             [self.fuel_columns].mean())
+               for area_column in ['Région', 'Département', 'cp_ville']}
+        }
+        # Number of stations for France and per region, department and city
+        self.stations_count = {
+            'France': dataframe['Nombre de stations'].sum(),
+            **{area_column: (dataframe
+                             .groupby(area_column, sort=False, observed=True)
+                             ['Nombre de stations'].sum())
+               for area_column in ['Région', 'Département', 'cp_ville']}
+        }
+        # National number of cities, the reference of every area
+        self.national_cs_count = dataframe['cp_ville'].nunique()
+        # Average price of each fuel per region and department, ranked once
+        # from the most to the least expensive
+        self.fuel_rankings = {}
+        for area_column in ['Région', 'Département']:
+            for fuel in self.fuel_columns:
+                self.fuel_rankings[(fuel, area_column)] = (
+                    self.avg_prices[area_column][fuel].dropna()
+                    .sort_values(ascending=False, kind='stable')
+                    .reset_index())
+        # Number of cities with at least one station per region and
+        # department, counted once
+        self.cities_count = {
+            area_column: (dataframe
+                          .groupby(area_column, sort=False, observed=True)
+                          ['cp_ville'].nunique())
+            for area_column in ['Région', 'Département']
+        }
+        # Options of the dropdowns. The department and city ones exist for
+        # every region and department when locked and for the whole country
+        # otherwise.
+        self.fuel_options = self._create_options(self.fuel_columns)
+        self.reg_options = self._create_options(self.reg)
+        self.dep_options = {
+            reg: self._create_options(self._from_reg_get_dep(reg))
+            for reg in self.reg
+        }
+        self.cit_options = {
+            dep: self._create_options(self._from_dep_get_cities(dep))
+            for dep in self.dep
+        }
+        self.all_dep_options = self._create_options(self.dep)
+        self.all_cit_options = self._create_options(
+            dataframe['cp_ville'].unique())
+        # Price histogram of each fuel, the fuel dropdown only switches
+        # between these figures in the browser
+        self.price_histograms = {
+            fuel: self._generate_price_histogram(fuel)
+            for fuel in self.fuel_columns
+        }
+        # The generated cards only depend on their argument, so they are
+        # memoized per instance and reused when a value is selected again.
+        # The figure and texts inside a card are only built by the card,
+        # so they need no cache of their own.
+        for method_name in ['_generate_area_card', '_generate_fuel_card']:
+            setattr(self, method_name,
+                    lru_cache(maxsize=512)(getattr(self, method_name)))
+        # The pages only depend on the data, so they are built once and
+        # returned as is on every navigation
+        self.layout_home = self._setup_layout_home()
+        self.layout_distribution = self._setup_layout_distribution()
+        self.layout_map = self._setup_layout_map()
+        self.layout_link = self._setup_layout_link()
+        # The navigation bar is shared by the layout and validation layout
+        self.navbar = self._setup_navbar()
         self._setup_layout()
         self._setup_validation_layout()
         self._register_callbacks()
@@ -58,7 +182,7 @@ class DashboardHolder:
         self.app.layout = html.Div(
             [
                 dcc.Location('url', refresh=False),
-                self._setup_navbar(),
+                self.navbar,
 
                 html.Div(
                     id='page-content',
@@ -83,16 +207,16 @@ class DashboardHolder:
             html.Div(
                 [
                     dcc.Location(id="url", refresh=False),
-                    self._setup_navbar(),
+                    self.navbar,
                     self._create_whitespace(10),
                     html.Div(id="page-content", children=[])
                 ],
                 className='navbar'
             ),
-            self._setup_layout_home(),
-            self._setup_layout_distribution(),
-            self._setup_layout_map(),
-            self._setup_layout_link()
+            self.layout_home,
+            self.layout_distribution,
+            self.layout_map,
+            self.layout_link
         ])
 
     def _register_callbacks(self):
@@ -144,95 +268,21 @@ class DashboardHolder:
             """
             return [self._generate_fuel_card(fuel) for fuel in selected_fuels]
 
-        @self.app.callback(
+        # The histograms of every fuel are sent once with the page, so the
+        # browser switches between them without calling the server
+        self.app.clientside_callback(
+            HISTOGRAM_SWITCH_CALLBACK,
             Output('histogram-plot', 'figure'),
-            [Input('fuel-dropdown', 'value')]
-        )
-        def update_histogram(fuel_selected):
-            """
-            This callback function updates the price histogram plot based on the
-             selected fuel type. It takes the selected fuel type as an input
-             and returns a new histogram figure with updated data.
-
-            Args:
-                fuel_selected (str): The selected fuel type for generating the
-                price histogram.
-
-            Returns:
-                plotly.graph_objs.Figure: A Plotly figure representing the
-                updated price histogram plot.
-            """
-            return self._generate_price_histogram(fuel_selected)
-
-        @self.app.callback(
-            Output('dep-dropdown', 'options'),
-            [Input('reg-dropdown', 'value'),
-             Input('switch-button', 'value')]
-        )
-        def update_dep_dropdown(reg, switch):
-            if switch == 'Verrouiller':
-                dep_list = self._from_reg_get_dep(reg)
-            else:
-                dep_list = self.data_frame['Département'].unique()
-
-            return [{'label': dep, 'value': dep} for dep in dep_list]
-
-        @self.app.callback(
-            Output('cit-dropdown', 'options'),
-            [Input('dep-dropdown', 'value'),
-             Input('switch-button', 'value')]
-        )
-        def update_cit_dropdown(dep, switch):
-            if switch == 'Verrouiller':
-                cities_list = self._from_dep_get_cities(dep)
-            else:
-                cities_list = self.data_frame['cp_ville'].unique()
-
-            return [{'label': cit, 'value': cit} for cit in cities_list]
-
-        @self.app.callback(
-            Output('dep-dropdown', 'value'),
-            [Input('dep-dropdown', 'options')]
-        )
-        def set_default_dep_value(options):
-            """
-            This callback function sets the default value for the department
-            dropdown based on the available options. If there are options
-            available, it selects the first option as the default value.
-
-            Args:
-                options (list): The list of available options for the department
-                 dropdown.
-
-            Returns:
-                str or None: The default value for the department dropdown, or
-                None if there are no options.
-            """
-            if options:
-                return options[0]['value']
-            return None
-
-        @self.app.callback(
-            Output('cit-dropdown', 'value'),
-            [Input('cit-dropdown', 'options')]
+            [Input('fuel-dropdown', 'value')],
+            [State('histogram-store', 'data')]
         )
-        def set_default_cit_value(options):
-            """
-            This callback function sets the default value for the city dropdown
-            based on the available options. If there are options available, it
-            selects the first option as the default value.
 
-            Args:
-                options (list): The list of available options for the city
-                dropdown.
-
-            Returns:
-                str or None: The default value for the city dropdown, or None if
-                 there are no options.
-            """
-            if options:
-                return options[0]['value']
-            return None
+        # The department and city dropdowns follow the region and department
+        # ones in the same way, so their callbacks come from the same helper
+        self._register_area_dropdown_callback('reg', 'dep', self.dep_options,
+                                              self.all_dep_options)
+        self._register_area_dropdown_callback('dep', 'cit', self.cit_options,
+                                              self.all_cit_options)
 
         @self.app.callback(
             Output('page-content', 'children'),
@@ -254,19 +304,67 @@ class DashboardHolder:
                 displayed on the page.
             """
             if pathname == '/distribution':
-                return self._setup_layout_distribution()
+                return self.layout_distribution
             if pathname == '/carte':
-                return self._setup_layout_map()
+                return self.layout_map
             if pathname == '/comparaisons':
-                return self._setup_layout_link()
-            return self._setup_layout_home()
+                return self.layout_link
+            return self.layout_home
+
+    def _register_area_dropdown_callback(self, parent, child, options,
+                                         all_options):
+        """
+        Register the callback updating the options of an area dropdown from
+        the value of its parent dropdown and the switch button. Options and
+        default value are returned together, so a change of region only needs
+        one round trip per dropdown level.
+
+        Args:
+            parent (str): The prefix of the parent dropdown id.
+
+            child (str): The prefix of the updated dropdown id.
+
+            options (dict): The options of the child dropdown per value of
+            the parent dropdown, used when the switch is locked.
+
+            all_options (list of str): The options of the child dropdown for
+            the whole country, used when the switch is unlocked.
+        """
+        @self.app.callback(
+            [Output(f'{child}-dropdown', 'options'),
+             Output(f'{child}-dropdown', 'value')],
+            [Input(f'{parent}-dropdown', 'value'),
+             Input('switch-button', 'value')]
+        )
+        def update_area_dropdown(area, switch):
+            """
+            This callback function updates the dropdown options based on the
+            selected parent area and the switch button, and selects the first
+            option as the default value.
+
+            Args:
+                area (str): The selected parent area.
+
+                switch (str): The value of the switch button.
+
+            Returns:
+                tuple: The dropdown options and the default value, or None if
+                there are no options.
+            """
+            if switch == 'Verrouiller':
+                area_options = options.get(area, [])
+            else:
+                area_options = all_options
+            return area_options, area_options[0] if area_options else None
 
     def _generate_folium_map(self):
         """
-        Generate a Folium map with a MarkerCluster for city markers.
+        Generate a Folium map with a FastMarkerCluster for city markers and
+        write it in the assets folder, so it is rendered once per run and
+        cached by the browser.
 
         Returns:
-            html.Iframe: An HTML iframe containing the rendered Folium map.
+            html.Iframe: An HTML iframe loading the rendered Folium map.
         """
         france_center = [46.232193, 2.209667]
         map1 = folium.Map(
@@ -282,57 +380,67 @@ class DashboardHolder:
             max_bounds=True
         )
 
-        marker_cluster = MarkerCluster().add_to(map1)
-        markers = self._get_city_markers()
-
-        for marker in markers:
-            marker.add_to(marker_cluster)
-
-        folium_map_html = map1.get_root().render()
-        return html.Iframe(srcDoc=folium_map_html,
+        # Markers are created by the browser from the raw rows, instead of
+        # rendering one folium.Marker and folium.Popup per city
+        FastMarkerCluster(self._get_city_markers(),
+                          callback=CITY_MARKER_CALLBACK).add_to(map1)
+
+        # The map is served as an asset instead of being sent through the
+        # Dash tree with srcDoc
+        assets_dir = Path(self.app.config.assets_folder)
+        assets_dir.mkdir(exist_ok=True)
+        map1.save(str(assets_dir / MAP_FILE_NAME))
+        return html.Iframe(src=self.app.get_asset_url(MAP_FILE_NAME),
                            className='folium-iframe-style')
 
     def _get_city_markers(self):
         """
-        Get a list of Folium Markers for cities with popup information.
+        Get the data of the city markers with popup information.
 
         Returns:
-            list: List of Folium Markers.
+            list: List of [latitude, longitude, popup content] rows.
         """
-        locations = self.data_frame[['Latitude', 'Longitude']].values
-        popup_contents = self.data_frame.apply(self._get_city_popup_content,
-                                               axis=1).tolist()
-
-        markers = [
-            folium.Marker(
-                location=[lat, lon],
-                popup=folium.Popup(popup_content, max_width=300)
-            )
-            for (lat, lon), popup_content in zip(locations, popup_contents)
-        ]
+        # The three columns are zipped as plain Python lists, which avoids
+        # iterating over numpy rows and serializes faster in the map.
+        # Coordinates are rounded to 5 decimals (about one meter) so that
+        # float32 values are not written with their binary noise.
+        coordinates = (self.data_frame[['Latitude', 'Longitude']]
+                       .to_numpy('float64').round(5))
+        markers = list(map(list, zip(
+            coordinates[:, 0].tolist(),
+            coordinates[:, 1].tolist(),
+            self._get_city_popup_contents()
+        )))
         return markers
 
-    def _get_city_popup_content(self, row):
+    def _get_city_popup_contents(self):
         """
-        Generate popup content for a city marker.
-
-        Args:
-            row (pd.Series): A row from the DataFrame containing city information.
+        Generate the popup content of every city marker, column by column
+        rather than row by row.
 
         Returns:
-            str: Popup content in HTML format.
+            list of str: Popup contents in HTML format, one per city.
         """
-        popup_title = f"<h4>{row['cp_ville']}</h4>"
-
-        popup_fuel = [
-            f"<b>{col}:</b> {row[col]:.3f}€/L<br>" if pd.notna(row[col]) else
-            f"<b>{col}:</b> <span style='color:red;'>Non disponible</span><br>"
-            for col in self.fuel_columns
-        ]
+        # Each part of the popups is formatted for all the cities at once,
+        # the parts of a city are then joined in a single concatenation
+        popup_parts = [np.char.mod('<h4>%s</h4><br>',
+                                   self.data_frame['cp_ville'].to_numpy(str))]
+
+        for col in self.fuel_columns:
+            prices = self.data_frame[col].to_numpy()
+            popup_parts.append(np.where(
+                np.isnan(prices),
+                f"<b>{col}:</b> <span style='color:red;'>Non disponible</span>"
+                "<br>",
+                np.char.mod(f'<b>{col}:</b> %.3f€/L<br>', prices)
+            ))
 
-        popup_stations_count = f"<br><b>Nombre de stations:</b> {row['Nombre de stations']}"
+        popup_parts.append(
+            np.char.mod('<br><b>Nombre de stations:</b> %d',
+                        self.data_frame['Nombre de stations'].to_numpy())
+        )
 
-        return f"{popup_title}<br>{''.join(popup_fuel)}{popup_stations_count}"
+        return list(map(''.join, zip(*popup_parts)))
 
     def _generate_price_histogram(self, selected_fuel='Gazole'):
         """
@@ -348,20 +456,57 @@ class DashboardHolder:
             plotly.graph_objs._figure.Figure: A Plotly figure representing the
             generated price histogram.
         """
-        histogram_fig = px.histogram(
-            self.data_frame,
-            x=selected_fuel,
-            title=f"Histogramme des prix en France du {selected_fuel}",
-            labels={selected_fuel: f"Prix du {selected_fuel} en €"}
-        )
-
-        histogram_fig.update_traces(
+        # Bars are drawn from the precomputed bin counts, so only the bins are
+        # sent to the browser instead of every price
+        bin_edges, bin_counts = self._compute_price_bins(
+            self.data_frame[selected_fuel])
+
+        histogram_fig = go.Figure(go.Bar(
+            x=bin_edges[:-1] + HISTOGRAM_BIN_SIZE / 2,
+            y=bin_counts,
+            width=HISTOGRAM_BIN_SIZE,
             marker={'line': {'width': 1, 'color': 'Blue'}},
-            xbins_size=0.05
+            hovertemplate=(f"Prix du {selected_fuel} en €=%{{x:.3f}}<br>"
+                           "count=%{y}<extra></extra>")
+        ))
+
+        histogram_fig.update_layout(
+            title=f"Histogramme des prix en France du {selected_fuel}",
+            xaxis_title=f"Prix du {selected_fuel} en €",
+            yaxis_title='count',
+            bargap=0
         )
 
         return histogram_fig
 
+    @staticmethod
+    def _compute_price_bins(prices):
+        """
+        Compute the histogram of prices with bins of HISTOGRAM_BIN_SIZE €,
+        aligned on multiples of the bin size.
+
+        Args:
+            prices (pd.Series): The prices to distribute in the bins.
+
+        Returns:
+            tuple: The bin edges and the number of prices in each bin.
+        """
+        prices = prices.dropna().to_numpy()
+        if prices.size == 0:
+            return np.array([0.0]), np.array([], dtype=int)
+
+        # Prices are binned on integer indices, rounded first so that a price
+        # on a multiple of the bin size is not moved by float noise, and the
+        # edges are rounded to the cent for the same reason
+        bin_indices = np.floor(
+            np.round(prices / HISTOGRAM_BIN_SIZE, 6)).astype(int)
+        first_index = bin_indices.min()
+        bin_counts = np.bincount(bin_indices - first_index)
+        bin_edges = np.round(
+            (first_index + np.arange(bin_counts.size + 1))
+            * HISTOGRAM_BIN_SIZE, 2)
+        return bin_edges, bin_counts
+
     @staticmethod
     def _generate_color_mapping(list_to_map):
         """
@@ -376,7 +521,7 @@ class DashboardHolder:
                 dict: A dictionary mapping items in the list to unique colors.
             """
         color_mapping = {}
-        color_scale = px.colors.qualitative.Light24_r
+        color_scale = plotly.colors.qualitative.Light24_r
         for i, items in enumerate(list_to_map):
             color_mapping[items] = color_scale[i]
         return color_mapping
@@ -408,16 +553,19 @@ class DashboardHolder:
             plotly.graph_objs._figure.Figure: A Plotly figure representing the
             generated pie chart.
         """
-        fig = px.pie(
-            dataframe,
-            names=names_column,
-            values=values_column,
-            title=title,
-            color=names_column,
-            color_discrete_map=color_mapping,
-            hole=0.5
-        ).update_traces(textinfo='percent + label',
-                        textposition='outside').update_layout(showlegend=False)
+        # The trace is built directly, plotly express would first reshape
+        # the data into a long format to produce the same pie
+        names = dataframe[names_column]
+        fig = go.Figure(go.Pie(
+            labels=names,
+            values=dataframe[values_column],
+            marker={'colors': names.map(color_mapping)},
+            hole=0.5,
+            textinfo='percent + label',
+            textposition='outside',
+            hovertemplate=f'{names_column}=%{{label}}<br>'
+                          f'{values_column}=%{{value}}<extra></extra>'
+        )).update_layout(title=title, showlegend=False)
 
         return fig
 
@@ -456,6 +604,12 @@ class DashboardHolder:
             list: A list of Dash components representing the home layout of the
             web page.
         """
+        # The switch starts locked, so the dropdowns start with the
+        # departments of the first region and the cities of its first
+        # department instead of every department and city of France
+        first_reg = self.reg_options[0]
+        first_dep = self.dep_options[first_reg][0]
+
         return [
             dbc.Card(
                 [
@@ -476,12 +630,11 @@ class DashboardHolder:
                 dbc.Row([
                     self._create_switch_button('switch-button'),
                     self._create_dropdown('Sélectionnez la région :',
-                                          self.data_frame['Région'], 'reg'),
+                                          self.reg_options, 'reg'),
                     self._create_dropdown('Sélectionnez le département :',
-                                          self.data_frame['Département'],
-                                          'dep'),
+                                          self.dep_options[first_reg], 'dep'),
                     self._create_dropdown('Sélectionnez la ville :',
-                                          self.data_frame['cp_ville'], 'cit')
+                                          self.cit_options[first_dep], 'cit')
                 ]),
 
                 self._create_whitespace(10),
@@ -528,8 +681,9 @@ class DashboardHolder:
             # Histogram
             dbc.Col([
                 self._create_dropdown('Sélectionnez le carburant :',
-                                      self.fuel_columns, 'fuel'),
-                self._create_graph_card(True, 'histogram-plot')
+                                      self.fuel_options, 'fuel'),
+                self._create_graph_card(True, 'histogram-plot'),
+                dcc.Store(id='histogram-store', data=self.price_histograms)
             ]),
 
             self._create_whitespace(10),
@@ -539,7 +693,7 @@ class DashboardHolder:
                 self._create_graph_card(
                     False,
                     generate_static_graph=self._generate_pie_chart(
-                        self.data_frame,
+                        self.stations_count['Région'].reset_index(),
                         'Région',
                         'Nombre de stations',
                         'Distribution des Stations par Région',
@@ -553,8 +707,7 @@ class DashboardHolder:
                 self._create_graph_card(
                     False,
                     generate_static_graph=self._generate_pie_chart(
-                        self.data_frame.groupby('Région')['cp_ville']
-                        .nunique()
+                        self.cities_count['Région']
                         .reset_index()
                         .rename(
                             columns={'cp_ville': 'Number_of_Cities'}
@@ -626,13 +779,13 @@ class DashboardHolder:
             html.Div([
                 dbc.Row([
                     dbc.Col(self._create_dropdown('Sélectionnez le carburant :',
-                                                  self.fuel_columns, 'fuel-1',
+                                                  self.fuel_options, 'fuel-1',
                                                   'Gazole')),
                     dbc.Col(self._create_dropdown('Sélectionnez le carburant :',
-                                                  self.fuel_columns, 'fuel-2',
+                                                  self.fuel_options, 'fuel-2',
                                                   first_value='SP98')),
                     dbc.Col(self._create_dropdown('Sélectionnez le carburant :',
-                                                  self.fuel_columns, 'fuel-3',
+                                                  self.fuel_options, 'fuel-3',
                                                   first_value='SP95')),
                 ]),
 
@@ -690,30 +843,77 @@ class DashboardHolder:
             ], className='footer')
         ])
 
-    def _get_data_from_area(self, area):
+    def _get_area_column(self, area):
         """
-        Retrieves and returns a subset of the dataset, filtering it by a
-        specific geographic area. The area can be defined by its name,
-        which could be a region, department, or "France" for the entire country.
+        Retrieves the column of the dataset in which a geographic area is
+        defined.
 
         Args:
-            area (str): The name of the geographic area for which to retrieve
-            data.
+            area (str): The name of the geographic area.
 
         Returns:
-            pandas.DataFrame: A DataFrame containing the data filtered by the
-            specified area.
-        """
-        if area != 'France':
-            if area[0].isdigit():
-                area_query = 'cp_ville'
-            elif area in self.reg:
-                area_query = 'Région'
-            else:
-                area_query = 'Département'
-            return self.data_frame.query(f'{area_query} == "{area}"')
+            str or None: 'cp_ville', 'Région' or 'Département', or None for
+            "France".
+        """
+        if area == 'France':
+            return None
+        if area[0].isdigit():
+            return 'cp_ville'
+        # The region dict gives a hashed lookup instead of scanning the
+        # array of regions
+        if area in self.reg_departments:
+            return 'Région'
+        return 'Département'
+
+    def _get_fuel_availability(self, area):
+        """
+        Retrieves the percentage of cities where each fuel is available in a
+        specific geographic area.
+
+        Args:
+            area (str): The name of the geographic area.
+
+        Returns:
+            pandas.Series: The rounded availability percentage of each fuel.
+        """
+        area_column = self._get_area_column(area)
+        if area_column is not None:
+            return self.fuel_availability[area_column].loc[area]
+
+        return self.fuel_availability['France']
+
+    def _get_avg_prices(self, area):
+        """
+        Retrieves the average price of each fuel in a specific geographic
+        area.
+
+        Args:
+            area (str): The name of the geographic area.
 
-        return self.data_frame
+        Returns:
+            pandas.Series: The average price of each fuel.
+        """
+        area_column = self._get_area_column(area)
+        if area_column is not None:
+            return self.avg_prices[area_column].loc[area]
+
+        return self.avg_prices['France']
+
+    def _get_stations_count(self, area):
+        """
+        Retrieves the number of stations in a specific geographic area.
+
+        Args:
+            area (str): The name of the geographic area.
+
+        Returns:
+            int: The number of stations.
+        """
+        area_column = self._get_area_column(area)
+        if area_column is not None:
+            return self.stations_count[area_column].loc[area]
+
+        return self.stations_count['France']
 
     def _generate_average_barchart(self, area):
         """
@@ -729,59 +929,26 @@ class DashboardHolder:
             plotly.graph_objs._figure.Figure: A Plotly figure representing the
             bar chart.
         """
-        data = self._get_data_from_area(area)
-        national_data = self._get_data_from_area('France')
-
-        national_percentage = [
-            (fuel,
-             round(national_data[fuel].count() / national_data.shape[0] * 100))
-            for fuel in self.fuel_columns
-        ]
-
-        national_percentage = pd.DataFrame(
-            national_percentage,
-            columns=['Fuel_Type', 'nat_per']
-        )
-
-        national_percentage = national_percentage.sort_values(
-            by='nat_per',
-            ascending=False
-        )
-
-        area_percentage = [
-            (fuel, round(data[fuel].count() / data.shape[0] * 100)) for
-            fuel in self.fuel_columns
-        ]
-
-        area_percentage = pd.DataFrame(
-            area_percentage,
-            columns=['Fuel_Type', 'area_per']
-        )
-
-        area_percentage['Fuel_Type'] = pd.Categorical(
-            area_percentage['Fuel_Type'],
-            categories=national_percentage['Fuel_Type'],
-            ordered=True)
-        area_percentage = area_percentage.sort_values(by='Fuel_Type')
-
-        merged_percentage = pd.merge(
-            area_percentage, national_percentage, on='Fuel_Type'
-        )
+        # Fuels ordered by national availability, with the area percentages
+        # gathered in the same order
+        national_percentage = self._get_fuel_availability('France')
+        fuel_types = national_percentage.index.to_numpy()
+        area_percentage = (self._get_fuel_availability(area)
+                           .reindex(fuel_types).to_numpy())
+        differences = area_percentage - national_percentage.to_numpy()
 
         fig = go.Figure()
 
         fig.add_trace(go.Bar(
-            x=merged_percentage['Fuel_Type'],
-            y=merged_percentage['area_per'],
+            x=fuel_types,
+            y=area_percentage,
             name='Area Data',
-            text=merged_percentage['area_per'],
+            text=area_percentage,
             textposition='auto',
             marker={'color': 'lightblue'}
         ))
 
-        for _, row in merged_percentage.iterrows():
-            diff = round(row['area_per'] - row['nat_per'])
-
+        for fuel_type, diff in zip(fuel_types, differences):
             if diff == 0:
                 continue
             if diff > 0:
@@ -792,7 +959,7 @@ class DashboardHolder:
                 color = 'lightcoral'
 
             fig.add_trace(go.Bar(
-                x=[row['Fuel_Type']],
+                x=[fuel_type],
                 y=[diff],
                 text=diff_text,
                 textposition='auto',
@@ -843,14 +1010,12 @@ class DashboardHolder:
         text_fuel_list = []
 
         for area in list_area:
-            avg_fuel_price = (self.data_frame
-                              .groupby(area)[fuel]
-                              .mean()
-                              .reset_index())
-            top_5 = (avg_fuel_price.nlargest(5, fuel)
-                     .sort_values(by=fuel, ascending=False))
-            min_5 = (avg_fuel_price.nsmallest(5, fuel)
-                     .sort_values(by=fuel, ascending=True))
+            ranking = self.fuel_rankings[(fuel, area)]
+            top_5 = ranking.head(5)
+            min_5 = ranking.tail(5).iloc[::-1]
+            # Prices are formatted for the whole list in one call
+            top_5_texts = np.char.mod('%.3f €/L', top_5[fuel].to_numpy())
+            min_5_texts = np.char.mod('%.3f €/L', min_5[fuel].to_numpy())
 
             text_fuel_list.extend([
                 html.H5(
@@ -862,13 +1027,14 @@ class DashboardHolder:
                 html.Ol([
                     html.Li(
                         [
-                            html.Span(f"{row[1][area]} : ",
+                            html.Span(f"{area_name} : ",
                                       className='span-text-info'
                                       ),
-                            f"{row[1][fuel]:.3f} €/L"
+                            price_text
                         ]
                     )
-                    for row in top_5.iterrows()
+                    for area_name, price_text in zip(top_5[area],
+                                                     top_5_texts)
                 ], className='font12'
                 ),
 
@@ -882,13 +1048,14 @@ class DashboardHolder:
                 html.Ol([
                     html.Li(
                         [
-                            html.Span(f"{row[1][area]} : ",
+                            html.Span(f"{area_name} : ",
                                       className='span-text-info'
                                       ),
-                            f"{row[1][fuel]:.3f} €/L"
+                            price_text
                         ]
                     )
-                    for row in min_5.iterrows()
+                    for area_name, price_text in zip(min_5[area],
+                                                     min_5_texts)
                 ], className='font12'
                 )
             ])
@@ -915,32 +1082,35 @@ class DashboardHolder:
             dash.html.Ul: An HTML <ul> element containing the information about
             the area.
         """
-        area_data = self._get_data_from_area(area)
-        avg_area_price = area_data[self.fuel_columns].mean()
-        area_stations_count = area_data['Nombre de stations'].sum()
-
-        national_data = self._get_data_from_area('France')
-        avg_prices_national = national_data[self.fuel_columns].mean()
-        national_cs_count = self.data_frame['cp_ville'].nunique()
-        national_stations_count = national_data['Nombre de stations'].sum()
+        avg_area_price = self._get_avg_prices(area)
+        area_stations_count = self._get_stations_count(area)
+
+        # Differences with the national averages, rounded as they are
+        # displayed, for all the fuels at once
+        prices = avg_area_price.to_numpy()
+        price_diffs = (np.round(prices, 3)
+                       - np.round(self.avg_prices['France'].to_numpy(), 3))
+        # Prices and differences are formatted for all the fuels in one call
+        price_strs = np.char.mod(' : %.3f €/L', prices)
+        price_diff_strs = np.char.mod('(%+.3f)', price_diffs)
+        missing_prices = np.isnan(prices)
 
         text_info_list = []
 
-        for fuel in self.fuel_columns:
-            price = avg_area_price[fuel]
-            if pd.notna(price):
+        for fuel, missing, price_diff, price_str, price_diff_str in zip(
+                self.fuel_columns, missing_prices, price_diffs, price_strs,
+                price_diff_strs):
+            if not missing:
                 price_text = (
                     html.Span(fuel, className='span-text-info'),
-                    html.Span(f' : {price:.3f} €/L')
+                    html.Span(price_str)
                 )
 
                 price_diff_text = None
                 color = 'black'
 
                 if area != 'France':
-                    price_diff = (round(price, 3)
-                                  - round(avg_prices_national[fuel], 3))
-                    price_diff_text = f'({price_diff:+.3f})'
+                    price_diff_text = price_diff_str
 
                     if price_diff == 0:
                         price_diff_text = '(-.---) ='
@@ -970,24 +1140,22 @@ class DashboardHolder:
                 )
             )
 
-        if area in self.reg:
-            area_cs_count = (self.data_frame.groupby('Région')['cp_ville']
-                             .nunique())[area]
+        if area in self.reg_departments:
+            area_cs_count = self.cities_count['Région'][area]
             color = 'grey'
-        elif area in self.dep:
-            area_cs_count = (self.data_frame.groupby('Département')['cp_ville']
-                             .nunique())[area]
+        elif area in self.dep_cities:
+            area_cs_count = self.cities_count['Département'][area]
             color = 'grey'
         elif area[0].isdigit():
             area_cs_count = 1
             color = 'white'
         else:
-            area_cs_count = self.data_frame['cp_ville'].nunique()
+            area_cs_count = self.national_cs_count
             color = 'grey'
 
         area_stations_rate = (
-                area_stations_count / national_stations_count * 100)
-        area_cs_rate = area_cs_count / national_cs_count * 100
+                area_stations_count / self.stations_count['France'] * 100)
+        area_cs_rate = area_cs_count / self.national_cs_count * 100
 
         text_info_list.append(
             html.Div(
@@ -1044,7 +1212,7 @@ class DashboardHolder:
                         )
 
     @staticmethod
-    def _create_dropdown(ptext, plist, id_dropdown, first_value=None):
+    def _create_dropdown(ptext, options, id_dropdown, first_value=None):
         """
         This function generates a Dash Dropdown component for selecting options
          from a list.
@@ -1052,8 +1220,8 @@ class DashboardHolder:
         Args:
             ptext (str): The label or text to display next to the dropdown.
 
-            plist (pd.Series or iterable): The list of options to populate the
-            dropdown.
+            options (list of str): The options to populate the dropdown,
+            as created by _create_options.
 
             id_dropdown (str): The ID to assign to the dropdown.
 
@@ -1064,10 +1232,8 @@ class DashboardHolder:
             dash.development.web.Dropdown: A Dash Dropdown component with the
             specified label, options, and ID.
         """
-        if not isinstance(plist, pd.Series):
-            plist = pd.Series(plist)
         if first_value is None:
-            first_value = plist.unique()[0]
+            first_value = options[0]
         column = 3
         if id_dropdown.split('-')[0] == 'fuel' and first_value is not None:
             column = 12
@@ -1077,14 +1243,28 @@ class DashboardHolder:
                 html.Label(ptext),
                 dcc.Dropdown(
                     id=f'{id_dropdown}-dropdown',
-                    options=[{'label': element, 'value': element}
-                             for element in plist.unique()],
+                    options=options,
                     value=first_value,
                     clearable=False
                 ),
             ], md=column
         )
 
+    @staticmethod
+    def _create_options(values):
+        """
+        Create the options of a dropdown, each value being its own label.
+
+        Args:
+            values (iterable): The values to select from.
+
+        Returns:
+            list of str: The options of the dropdown.
+        """
+        # Dash uses a string option as both label and value, which halves
+        # the size of the options sent to the browser compared to dicts
+        return list(values)
+
     def _generate_fuel_card(self, fuel):
         """
         Generate a card component displaying information for a specific
@@ -1222,9 +1402,8 @@ class DashboardHolder:
             list : A list of unique French departments in the specified
             department.
         """
-        filtered_data = self.data_frame.query(f'Région == "{reg}"')
-        departments = filtered_data['Département'].unique().tolist()
-        return departments
+        # The departments are listed once per region in __init__
+        return self.reg_departments.get(reg, [])
 
     def _from_dep_get_cities(self, dep):
         """
@@ -1236,9 +1415,8 @@ class DashboardHolder:
         Returns:
             cities : A list of unique French cities in the specified department.
         """
-        filtered_data = self.data_frame.query(f'Département == "{dep}"')
-        cities = filtered_data['cp_ville'].unique().tolist()
-        return cities
+        # The cities are listed once per department in __init__
+        return self.dep_cities.get(dep, [])
 
     @staticmethod
     def _create_switch_button(button_switch):